@@ -1,76 +1,214 @@
+import argparse
+import functools
+import importlib.util
+import os
+
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 
-# Load metrics summary CSV
-df = pd.read_csv("summary/metrics_summary.csv")
+METRICS_CSV = "summary/metrics_summary.csv"
 
-# --- Fix: derive group column from actual columns ---
-df['group'] = df['strategy'].astype(str) + "_" + df['hashing_method'].astype(str)
+# Only the columns plotted below are materialized, with their types fixed up
+# front so the parser skips dtype inference
+METRICS_DTYPES = {
+    "input_size": "float64",  # "NA" when the harness cannot find an input file
+    "hashing_method": "category",
+    "strategy": "category",
+    "collisions": "float64",
+    "comparisons": "float64",
+    "execution_time_sec": "float64",
+}
 
-# Optional: rename columns for clarity
-df.rename(columns={
-    'comparisons': 'total_comparisons',
-    'collisions': 'total_collisions',
-    'execution_time_sec': 'execution_time'
-}, inplace=True)
 
-# Seaborn styling
-sns.set(style="darkgrid", context="notebook")
+def read_metrics_csv(file_path, engine="pyarrow"):
+    """Read the metrics summary CSV, preferring Arrow's multithreaded parser.
 
-# Color palette by group
-palette = sns.color_palette("Set1", n_colors=len(df['group'].unique()))
-group_palette = {group: color for group, color in zip(df['group'].unique(), palette)}
+    When pyarrow is installed the typed frame is also cached as a sibling
+    .parquet file, which is reused while it is newer than the CSV and still
+    has exactly the columns and dtypes in METRICS_DTYPES.
+    """
+    have_arrow = importlib.util.find_spec("pyarrow") is not None
+    if engine == "pyarrow" and not have_arrow:
+        engine = "c"
 
-# ------------------ Plot 1: Total Comparisons vs Input Size + Asymptotics ------------------
-plt.figure(figsize=(14, 6))
-for group in df['group'].unique():
-    subset = df[df['group'] == group]
-    sns.lineplot(
-        data=subset,
-        x="input_size",
-        y="total_comparisons",
-        label=group,
-        marker='o',
-        linewidth=2,
-        color=group_palette[group]
+    parquet_path = os.path.splitext(file_path)[0] + ".parquet"
+    if (have_arrow and os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path)):
+        cached = pd.read_parquet(parquet_path, engine="pyarrow")
+        if {col: str(dtype) for col, dtype in cached.dtypes.items()} == METRICS_DTYPES:
+            return cached
+
+    df = pd.read_csv(
+        file_path,
+        engine=engine,
+        usecols=list(METRICS_DTYPES),
+        dtype=METRICS_DTYPES,
+    )
+    if have_arrow:
+        try:
+            df.to_parquet(parquet_path, engine="pyarrow", compression="zstd")
+        except OSError:
+            pass  # e.g. read-only checkout; just parse the CSV next time
+    return df
+
+
+@functools.lru_cache(maxsize=1)
+def _load_metrics(file_path, mtime):
+    df = read_metrics_csv(file_path)
+
+    # --- Fix: derive group column from actual columns ---
+    # Built from the integer category codes rather than concatenating strings
+    # row by row. A missing strategy or method (code -1) gives a NaN group.
+    # (.cat.codes are int8, so widen them before combining to avoid overflow)
+    strategy = df['strategy'].cat
+    method = df['hashing_method'].cat
+    strategy_codes = strategy.codes.to_numpy(dtype=np.int64)
+    method_codes = method.codes.to_numpy(dtype=np.int64)
+    codes = np.where(
+        (strategy_codes < 0) | (method_codes < 0),
+        -1,
+        strategy_codes * len(method.categories) + method_codes,
     )
+    df['group'] = pd.Categorical.from_codes(
+        codes,
+        categories=[f"{s}_{m}" for s in strategy.categories for m in method.categories],
+    ).remove_unused_categories()
+
+    # Optional: rename columns for clarity
+    df.rename(columns={
+        'comparisons': 'total_comparisons',
+        'collisions': 'total_collisions',
+        'execution_time_sec': 'execution_time'
+    }, inplace=True)
+    return df
+
+
+def load_metrics(file_path=METRICS_CSV):
+    """Load and prepare the metrics summary, parsing the CSV once per session.
+
+    The result is cached on (path, mtime), so callers share one DataFrame and
+    must treat it as read-only; an updated CSV is picked up automatically.
+    """
+    return _load_metrics(file_path, os.path.getmtime(file_path))
 
-# Overlay theoretical asymptotic curves
-n_vals = sorted(df['input_size'].unique())
-plt.plot(n_vals, [x for x in n_vals], '--', color='black', label='O(n)')
-plt.plot(n_vals, [np.log2(x) * 500 for x in n_vals], '--', color='gray', label='O(log n)')
-plt.plot(n_vals, [500] * len(n_vals), '--', color='lightgray', label='O(1)')
-
-plt.title("Total Comparisons vs Input Size with Asymptotic Benchmarks")
-plt.xlabel("Input Size")
-plt.ylabel("Comparisons")
-plt.legend(loc="upper left", fontsize='small')
-plt.tight_layout()
-plt.savefig("asymptotic_benchmark_plot.png")
-plt.show()
-
-# ------------------ Plot 2: Subplots for Comparisons, Collisions, and Time ------------------
-fig, axs = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
-metrics = ["total_comparisons", "total_collisions", "execution_time"]
-titles = ["Total Comparisons", "Total Collisions", "Execution Time (seconds)"]
-
-for i, (metric, title) in enumerate(zip(metrics, titles)):
+
+def plot_asymptotic_benchmarks(df, group_palette, ax):
+    """Total comparisons per group with O(n), O(log n) and O(1) overlays."""
     sns.lineplot(
         data=df,
         x="input_size",
-        y=metric,
+        y="total_comparisons",
         hue="group",
-        marker='o',
-        ax=axs[i],
         palette=group_palette,
-        linewidth=2
+        marker='o',
+        linewidth=2,
+        ax=ax
     )
-    axs[i].set_title(f"{title} vs Input Size", fontsize=12)
-    axs[i].set_ylabel(title)
 
-axs[2].set_xlabel("Input Size")
-plt.tight_layout()
-plt.savefig("asymptotic_subplots.png")
-plt.show()
+    # Overlay theoretical asymptotic curves (one plot call for all of them)
+    n_vals = np.sort(df['input_size'].unique())
+    benchmarks = {
+        'O(n)': (n_vals, 'black'),
+        'O(log n)': (np.log2(n_vals) * 500, 'gray'),
+        'O(1)': (np.full(len(n_vals), 500), 'lightgray'),
+    }
+    lines = ax.plot(n_vals, np.column_stack([y for y, _ in benchmarks.values()]), '--')
+    for line, (label, (_, color)) in zip(lines, benchmarks.items()):
+        line.set_label(label)
+        line.set_color(color)
+
+    ax.set_title("Total Comparisons vs Input Size with Asymptotic Benchmarks")
+    ax.set_xlabel("Input Size")
+    ax.set_ylabel("Comparisons")
+    ax.legend(loc="upper left", fontsize='small')
+
+
+def plot_metric_subplots(df, group_palette, axs):
+    """Comparisons, collisions and execution time per group, one metric per axis."""
+    metrics = ["total_comparisons", "total_collisions", "execution_time"]
+    titles = ["Total Comparisons", "Total Collisions", "Execution Time (seconds)"]
+
+    for ax, metric, title in zip(axs, metrics, titles):
+        sns.lineplot(
+            data=df,
+            x="input_size",
+            y=metric,
+            hue="group",
+            marker='o',
+            ax=ax,
+            palette=group_palette,
+            linewidth=2
+        )
+        ax.set_title(f"{title} vs Input Size", fontsize=12)
+        ax.set_ylabel(title)
+
+    axs[-1].set_xlabel("Input Size")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Plot hashing metrics against asymptotic benchmarks."
+    )
+    parser.add_argument(
+        "--interactive", action="store_true",
+        help="show each figure in a window after saving it"
+    )
+    parser.add_argument(
+        "--separate", action="store_true",
+        help="write the legacy asymptotic_benchmark_plot.png and "
+             "asymptotic_subplots.png instead of one asymptotic_report.png"
+    )
+    args = parser.parse_args(argv)
+    if not args.interactive:
+        # Batch runs only write PNGs, so never start a GUI backend
+        matplotlib.use("Agg")
+
+    df = load_metrics()
+
+    # Seaborn styling
+    sns.set(style="darkgrid", context="notebook")
+
+    # Color palette by group
+    palette = sns.color_palette("Set1", n_colors=len(df['group'].unique()))
+    group_palette = {group: color for group, color in zip(df['group'].unique(), palette)}
+
+    if args.separate:
+        # ------------------ Plot 1: Total Comparisons vs Input Size + Asymptotics ------------------
+        fig, ax = plt.subplots(figsize=(14, 6))
+        plot_asymptotic_benchmarks(df, group_palette, ax)
+        fig.tight_layout()
+        fig.savefig("asymptotic_benchmark_plot.png")
+        if args.interactive:
+            plt.show()
+        plt.close(fig)
+
+        # ------------------ Plot 2: Subplots for Comparisons, Collisions, and Time ------------------
+        fig, axs = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
+        plot_metric_subplots(df, group_palette, axs)
+        fig.tight_layout()
+        fig.savefig("asymptotic_subplots.png")
+        if args.interactive:
+            plt.show()
+        plt.close(fig)
+        return
+
+    # ------------------ Single report: benchmarks on top, one metric per row below ------------------
+    fig, axs = plt.subplots(
+        4, 1, figsize=(14, 16), sharex=True,
+        gridspec_kw={"height_ratios": [1.5, 1, 1, 1]}
+    )
+    plot_asymptotic_benchmarks(df, group_palette, axs[0])
+    axs[0].set_xlabel("")
+    plot_metric_subplots(df, group_palette, axs[1:])
+    fig.tight_layout()
+    fig.savefig("asymptotic_report.png")
+    if args.interactive:
+        plt.show()
+    plt.close(fig)
+
+
+if __name__ == "__main__":
+    main()